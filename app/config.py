@@ -6,9 +6,16 @@ except ImportError as e:
         "Missing required dependency 'pyyaml'. Install it with 'pip install pyyaml' or use the project's workflow: 'pip install uv' then 'uv sync' (see README)."
     ) from e
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
 
+try:
+    # Prefer the libyaml C parser when available
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 CONFIG_PATH = Path(os.getenv("CONFIG_PATH", Path(__file__).resolve().parents[1] / "config" / "qdrant-config.yml"))
 
 DEFAULTS: Dict[str, Any] = {
@@ -36,13 +43,11 @@ DEFAULTS: Dict[str, Any] = {
 }
 
 
-def load_config(path: Path = CONFIG_PATH) -> Dict[str, Any]:
-    if not path.exists():
-        logging.getLogger(__name__).warning("Config file %s not found - using defaults", str(path))
-        return DEFAULTS.copy()
-
-    with open(path, "r", encoding="utf-8") as fh:
-        data = yaml.safe_load(fh) or {}
+@lru_cache(maxsize=4)
+def _load_cached(path_str: str, mtime_ns: int) -> Dict[str, Any]:
+    # mtime_ns keys the cache: edits to the file invalidate the entry
+    with open(path_str, "rb") as fh:
+        data = yaml.load(fh, Loader=_YamlLoader) or {}
 
     # merge defaults (simple shallow merge for top-level keys; nested maps replaced if present)
     cfg = DEFAULTS.copy()
@@ -56,10 +61,28 @@ def load_config(path: Path = CONFIG_PATH) -> Dict[str, Any]:
     return cfg
 
 
+def load_config(path: Path = CONFIG_PATH) -> Dict[str, Any]:
+    try:
+        st = path.stat()
+    except OSError:
+        logging.getLogger(__name__).warning("Config file %s not found - using defaults", str(path))
+        return DEFAULTS.copy()
+
+    return _load_cached(str(path), st.st_mtime_ns)
+
+
 CONFIG = load_config()
 
 
+_LOGGING_INITIALIZED = False
+
+
 def init_logging():
+    # O(1) repeat-call guard; replaces scanning root.handlers on every call
+    global _LOGGING_INITIALIZED
+    if _LOGGING_INITIALIZED:
+        return
+
     cfg = CONFIG.get("logging", {})
     level_name = cfg.get("level", "INFO").upper()
     level = getattr(logging, level_name, logging.INFO)
@@ -87,10 +110,9 @@ def init_logging():
     handler.setFormatter(formatter)
 
     root = logging.getLogger()
-    # Avoid adding duplicate handlers if init_logging is called multiple times
-    if not any(isinstance(h, type(handler)) and getattr(h, "baseFilename", None) == str(log_file) for h in root.handlers):
-        root.addHandler(handler)
+    root.addHandler(handler)
     root.setLevel(level)
+    _LOGGING_INITIALIZED = True
 
 
 # Initialize logging eagerly for modules that import CONFIG
@@ -1,6 +1,7 @@
 import os
 from typing import List, Optional
 import httpx
+import numpy as np
 import ollama
 # from sentence_transformers import SentenceTransformer
 
@@ -52,39 +53,93 @@ class OllamaEmbedder(BaseEmbedder):
                 self.ollama_client = None
         else:
             self.ollama_client = None
-    
-    
+
+        # Long-lived HTTP client for the fallback path; keepalive avoids a
+        # fresh TCP handshake per embedding batch
+        self._http = httpx.Client(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+        )
+
+    def close(self):
+        """Release pooled HTTP connections"""
+        try:
+            self._http.close()
+        except Exception:
+            pass
+
+    def __del__(self):
+        self.close()
+
     def _extract_embeddings(self, resp):
         # Ollama official client response
         if hasattr(resp, "embeddings"):
             return resp.embeddings
 
-        # HTTP fallback (dict)
+        # HTTP-style responses expose json(); unwrap before inspecting
+        if hasattr(resp, "json"):
+            resp = resp.json()
+
         if isinstance(resp, dict):
-            return resp["embeddings"]
+            embeds = resp.get("embeddings")
+            if isinstance(embeds, dict):
+                # metadata-heavy shape: index -> vector mapping; restore positional order
+                return [embeds[k] for k in sorted(embeds, key=int)]
+            if embeds is not None:
+                return embeds
+            # fallback: embeddings nested deeper, e.g. {..., "data": [{"embedding": [...]}, ...]}
+            found = self._find_embeddings(resp)
+            if found is not None:
+                return found
 
         raise TypeError(f"Unsupported Ollama response type: {type(resp)}")
 
-
-    def encode(self, texts: List[str]) -> List[List[float]]:
+    @staticmethod
+    def _find_embeddings(node):
+        """Search a nested response for a list of {'embedding': ...} entries"""
+        if isinstance(node, list):
+            if node and all(isinstance(item, dict) and "embedding" in item for item in node):
+                return [item["embedding"] for item in node]
+            for item in node:
+                found = OllamaEmbedder._find_embeddings(item)
+                if found is not None:
+                    return found
+        elif isinstance(node, dict):
+            for v in node.values():
+                found = OllamaEmbedder._find_embeddings(v)
+                if found is not None:
+                    return found
+        return None
+
+    def encode(self, texts: List[str]):
         if not texts:
             return []
-        data = None
 
         # Prefer using the official ollama client when available; fall back to direct HTTP otherwise
-        # Try common client method signature
         resp = None
-        try:
-            resp = self.ollama_client.embed(model=self.model, input=texts)
-        except Exception as e:
-            print(f"Failed to use ollama client Exception: {e!r}")
+        if self.ollama_client is not None:
+            try:
+                resp = self.ollama_client.embed(model=self.model, input=texts)
+            except Exception as e:
+                print(f"Failed to use ollama client Exception: {e!r}")
+
+        if resp is None:
+            # One batched request for the whole list of texts
+            http_resp = self._http.post(self.endpoint, json={"model": self.model, "input": texts}, timeout=self.timeout)
+            http_resp.raise_for_status()
+            resp = http_resp.json()
 
         embeddings = self._extract_embeddings(resp)
+        if embeddings is None or len(embeddings) == 0:
+            return []
+
+        # Single contiguous float32 allocation; callers avoid per-row .tolist() copies
+        vecs = np.asarray(embeddings, dtype=np.float32)
 
-        if embeddings and self.dim is None:
-            self.dim = len(embeddings[0])
+        if self.dim is None:
+            self.dim = int(vecs.shape[1]) if vecs.ndim > 1 else int(vecs.shape[0])
             print(f"Ollama embeddings dim: {self.dim}")
-        return embeddings if embeddings else []
+        return vecs
 
     def health(self) -> dict:
         """Basic health probe for the Ollama embedding endpoint"""
@@ -100,7 +155,7 @@ class OllamaEmbedder(BaseEmbedder):
                     resp = self.ollama_client.embed(**payload, timeout=5)
                 data = resp.json() if hasattr(resp, "json") else resp
             else:
-                resp = httpx.post(self.endpoint, json=payload, timeout=5)
+                resp = self._http.post(self.endpoint, json=payload, timeout=5)
                 resp.raise_for_status()
                 data = resp.json()
 
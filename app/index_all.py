@@ -2,7 +2,9 @@
 """CLI to index all data in data/ into Qdrant"""
 import argparse
 import asyncio
+import itertools
 import logging
+from qdrant_client.models import PointStruct
 from .ingest import iter_captions, iter_stories
 from .embeddings import embedder
 from .qdrant_service import qdrant
@@ -34,7 +36,8 @@ async def index_documents(doc_type: str = "all"):
     """Index documents with chunking and batching"""
     logger.info("Indexing %s", doc_type)
     
-    # Initialize chunker
+    # Initialize chunker; drop any spans cached by a previous run to cap memory
+    TextChunker.clear_cache()
     chunker = TextChunker(chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP)
     logger.info(f"Initialized chunker with size={CHUNK_SIZE}, overlap={CHUNK_OVERLAP}")
     
@@ -44,85 +47,135 @@ async def index_documents(doc_type: str = "all"):
     skip_stories = tracker.get_processed_files("stories")
     logger.info(f"Loaded tracker: {len(skip_captions)} captions, {len(skip_stories)} stories already processed")
 
-    # Gather raw documents
-    raw_docs = []
+    # Stream raw documents instead of materializing the corpus in RAM;
+    # chunks accumulate in a small buffer and are flushed per INDEX_BATCH
+    iterators = []
     if doc_type in ("all", "captions"):
-        raw_docs.extend(list(iter_captions(skip_files=skip_captions)))
+        iterators.append(iter_captions(skip_files=skip_captions))
     if doc_type in ("all", "stories"):
-        raw_docs.extend(list(iter_stories(skip_files=skip_stories)))
+        iterators.append(iter_stories(skip_files=skip_stories))
+    docs = itertools.chain(*iterators)
 
-    if not raw_docs:
-        logger.warning("No new documents found to index")
-        print("No new documents found to index")
-        return
-
-    logger.info("Processing %s raw documents", len(raw_docs))
-    
-    # Chunk all documents
-    all_chunks = []
-    for doc in raw_docs:
-        doc_id = doc['id']
-        text = doc['text']
-        
-        # Extract metadata from original doc
-        metadata = {
-            'type': doc['payload'].get('type'),
-            'source': doc['payload'].get('source'),
-        }
-        
-        # Chunk the document
-        chunks = chunker.chunk_text(text, doc_id, metadata)
-        all_chunks.extend(chunks)
-        
-        logger.debug(f"Document {doc_id} split into {len(chunks)} chunks")
-    
-    logger.info(f"Created {len(all_chunks)} chunks from {len(raw_docs)} documents")
-    
-    # Track which files are being processed in this run
+    # Track which files are being processed in this run (incrementally)
     newly_processed_files = {"captions": set(), "stories": set()}
-    for doc in raw_docs:
-        source = doc['payload'].get('source')
-        dtype = doc['payload'].get('type')
-        if dtype == "caption":
-            newly_processed_files["captions"].add(source)
-        else:
-            newly_processed_files["stories"].add(source)
-
-    # Process chunks in batches
+    raw_count = 0
+    chunk_count = 0
+
+    # Process chunks as a two-stage pipeline: embed batch N+1 while batch N
+    # is being upserted, so Ollama and Qdrant work in parallel. The queue is
+    # bounded to keep at most two embedded batches in flight.
     total_indexed = 0
-    for i in range(0, len(all_chunks), INDEX_BATCH):
-        batch = all_chunks[i : i + INDEX_BATCH]
-        batch_num = i // INDEX_BATCH + 1
-        logger.info("Indexing batch %s (%s chunks)", batch_num, len(batch))
-        
-        texts = [chunk["text"] for chunk in batch]
-        vecs = await _embed_texts(texts)
-        
-        captions_points = []
-        stories_points = []
-        
-        for chunk, vec in zip(batch, vecs):
-            point = {
-                "id": chunk["id"],
-                "vector": vec.tolist() if hasattr(vec, "tolist") else vec,
-                "payload": chunk["payload"]
-            }
-            
-            if chunk["payload"]["type"] == "caption":
-                captions_points.append(point)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+
+    def chunk_stream():
+        nonlocal raw_count, chunk_count
+        # hoist per-document attribute/key lookups out of the hot loop
+        _chunk_text = chunker.chunk_text
+        _add_caption = newly_processed_files["captions"].add
+        _add_story = newly_processed_files["stories"].add
+        for doc in docs:
+            raw_count += 1
+            payload = doc['payload']
+            dtype = payload.get('type')
+            source = payload.get('source')
+
+            # Extract metadata from original doc
+            metadata = {'type': dtype, 'source': source}
+
+            if dtype == "caption":
+                _add_caption(source)
             else:
-                stories_points.append(point)
-
-        # Upsert to collections
-        if captions_points:
-            qdrant.ensure_collection(CAPTIONS_COLLECTION, embedder.dim)
-            qdrant.upsert_points(CAPTIONS_COLLECTION, captions_points)
-        if stories_points:
-            qdrant.ensure_collection(STORIES_COLLECTION, embedder.dim)
-            qdrant.upsert_points(STORIES_COLLECTION, stories_points)
-
-        total_indexed += len(batch)
-        logger.info("Indexed batch %s - total indexed: %s", batch_num, total_indexed)
+                _add_story(source)
+
+            # Chunk the document
+            chunks = _chunk_text(doc['text'], doc['id'], metadata)
+            chunk_count += len(chunks)
+            logger.debug("Document %s split into %d chunks", doc['id'], len(chunks))
+            yield from chunks
+
+    async def producer():
+        stream = chunk_stream()
+        batch_num = 0
+        while True:
+            # islice pulls exactly one batch from the stream; no intermediate
+            # buffer copies
+            batch = list(itertools.islice(stream, INDEX_BATCH))
+            if not batch:
+                break
+            batch_num += 1
+            logger.info("Embedding batch %s (%s chunks)", batch_num, len(batch))
+            texts = [chunk["text"] for chunk in batch]
+
+            # Embed each distinct text once (boilerplate recurs across docs);
+            # duplicates are scattered back from the unique rows
+            index_of = {}
+            uniq_texts = []
+            rows = []
+            for t in texts:
+                idx = index_of.setdefault(t, len(uniq_texts))
+                if idx == len(uniq_texts):
+                    uniq_texts.append(t)
+                rows.append(idx)
+
+            vecs_uniq = await _embed_texts(uniq_texts)
+            if len(uniq_texts) < len(texts):
+                logger.debug("Batch %s: embedded %d unique of %d texts", batch_num, len(uniq_texts), len(texts))
+            if hasattr(vecs_uniq, "shape"):
+                vecs = vecs_uniq[rows]  # fancy-index scatter, single allocation
+            else:
+                vecs = [vecs_uniq[i] for i in rows]
+            await queue.put((batch_num, batch, vecs))
+
+        await queue.put(None)  # sentinel: no more batches
+
+    async def consumer():
+        nonlocal total_indexed
+        # Collections don't change mid-run; ensure each at most once, on the
+        # first batch that touches it (embedder.dim is known by then)
+        ensured = set()
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            batch_num, batch, vecs = item
+
+            # One batch-level conversion instead of a .tolist() copy per row
+            vec_lists = vecs.tolist() if hasattr(vecs, "tolist") else vecs
+
+            captions_points = []
+            stories_points = []
+
+            for chunk, vec in zip(batch, vec_lists):
+                # Build PointStruct directly; skips an intermediate dict that
+                # upsert_points would immediately re-wrap
+                point = PointStruct(id=chunk["id"], vector=vec, payload=chunk["payload"])
+
+                if chunk["payload"]["type"] == "caption":
+                    captions_points.append(point)
+                else:
+                    stories_points.append(point)
+
+            # Upsert to collections
+            if captions_points:
+                if CAPTIONS_COLLECTION not in ensured:
+                    qdrant.ensure_collection(CAPTIONS_COLLECTION, embedder.dim)
+                    ensured.add(CAPTIONS_COLLECTION)
+                await qdrant.upsert_points_async(CAPTIONS_COLLECTION, captions_points)
+            if stories_points:
+                if STORIES_COLLECTION not in ensured:
+                    qdrant.ensure_collection(STORIES_COLLECTION, embedder.dim)
+                    ensured.add(STORIES_COLLECTION)
+                await qdrant.upsert_points_async(STORIES_COLLECTION, stories_points)
+
+            total_indexed += len(batch)
+            logger.info("Indexed batch %s - total indexed: %s", batch_num, total_indexed)
+
+    await asyncio.gather(producer(), consumer())
+
+    if raw_count == 0:
+        logger.warning("No new documents found to index")
+        print("No new documents found to index")
+        return
 
     # Save progress after all batches are done
     for source in newly_processed_files["captions"]:
@@ -135,8 +188,8 @@ async def index_documents(doc_type: str = "all"):
     print(f"\n{'='*60}")
     print(f"Indexing complete!")
     print(f"{'='*60}")
-    print(f"Raw documents:  {len(raw_docs)}")
-    print(f"Chunks created: {len(all_chunks)}")
+    print(f"Raw documents:  {raw_count}")
+    print(f"Chunks created: {chunk_count}")
     print(f"Total indexed:  {total_indexed}")
     print(f"{'='*60}\n")
 
@@ -1,63 +1,144 @@
+import mmap
 import os
 import yaml
 import uuid
-from typing import Iterable, Dict, Any, List, Set
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, Dict, Any, List, Set, Tuple
+
+from .config import CONFIG
+
+try:
+    # libyaml C parser: typically 5-10x faster than the pure-Python loader
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 DATA_DIR = os.getenv("DATA_DIR", "data")
 
+# Auxiliary files that never contain indexable text
+_SKIP_NAMES = frozenset(("tags-content.yml", "metadata.yml", "thread.yml"))
+
+# Namespace for deterministic document IDs: re-ingesting the same file
+# produces the same UUIDs, so re-runs upsert instead of duplicating points
+NS = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
 
 def _iter_yaml_files(path: str):
-    for root, _, files in os.walk(path):
-        for f in files:
-            if f.endswith(".yml") or f.endswith(".yaml"):
-                yield os.path.join(root, f)
+    # scandir reuses DirEntry info (no extra stat per entry) and a single
+    # endswith tuple check replaces the two suffix tests per file
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_yaml_files(entry.path)
+            elif entry.name.endswith((".yml", ".yaml")):
+                yield entry.path
 
 
 def extract_text_fields_from_dict(d: Dict[str, Any]) -> List[str]:
-    """Recursively collect string values from a nested dict/list"""
+    """Collect string values from a nested dict/list (iterative, no recursion)"""
     out = []
-    if isinstance(d, dict):
-        for v in d.values():
-            out.extend(extract_text_fields_from_dict(v))
-    elif isinstance(d, list):
-        for v in d:
-            out.extend(extract_text_fields_from_dict(v))
-    elif isinstance(d, str):
-        out.append(d.strip())
+    stack = [d]
+    while stack:
+        x = stack.pop()
+        # type identity checks are cheaper than isinstance; YAML only ever
+        # produces the exact builtin types, so subclasses are a rare fallback
+        t = type(x)
+        if t is dict:
+            # reversed so values come off the stack in document order
+            stack.extend(reversed(list(x.values())))
+        elif t is list:
+            stack.extend(reversed(x))
+        elif t is str:
+            s = x.strip()
+            if s:
+                out.append(s)
+        elif isinstance(x, dict):
+            stack.extend(reversed(list(x.values())))
+        elif isinstance(x, list):
+            stack.extend(reversed(x))
+        elif isinstance(x, str):
+            s = x.strip()
+            if s:
+                out.append(s)
     return out
 
 
 def load_yaml(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as fh:
-        return yaml.safe_load(fh) or {}
+    # Memory-map the file so the parser reads straight from the page cache
+    # with no Python-level read copies; libyaml decodes UTF-8 in C
+    with open(path, "rb") as fh:
+        try:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return yaml.load(mm, Loader=_YamlLoader) or {}
+        except ValueError:
+            # zero-length files cannot be mapped
+            return yaml.load(fh, Loader=_YamlLoader) or {}
+
+
+_PARSE_MAX_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+# Cap parsed-but-unconsumed files so large trees stream instead of piling up in RAM
+_PARSE_WINDOW = 64
+# 'thread' overlaps I/O and libyaml parsing; 'process' also scales the
+# pure-Python loader across cores at the cost of worker startup + pickling
+_PARSE_EXECUTOR = CONFIG.get("ingest", {}).get("parse_executor", "thread")
+
+
+def _make_parse_pool():
+    if _PARSE_EXECUTOR == "process":
+        return ProcessPoolExecutor(max_workers=os.cpu_count())
+    return ThreadPoolExecutor(max_workers=_PARSE_MAX_WORKERS)
+
+
+def _iter_parsed_yaml(paths: Iterable[str]) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    """Parse YAML files on a worker pool, yielding (path, doc) in submission order"""
+    with _make_parse_pool() as pool:
+        pending = deque()
+        for path in paths:
+            pending.append((path, pool.submit(load_yaml, path)))
+            if len(pending) >= _PARSE_WINDOW:
+                done_path, fut = pending.popleft()
+                yield done_path, fut.result()
+        while pending:
+            done_path, fut = pending.popleft()
+            yield done_path, fut.result()
 
 
 def iter_captions(data_dir: str = DATA_DIR, skip_files: Set[str] = None) -> Iterable[Dict[str, Any]]:
     captions_dir = os.path.join(data_dir, "captions")
     if not os.path.exists(captions_dir):
         return
-    for file in _iter_yaml_files(captions_dir):
-        if skip_files and file in skip_files:
-            continue
-        if file.endswith("tags-content.yml") or file.endswith("metadata.yml") or file.endswith("thread.yml"):
-            continue
-        doc = load_yaml(file)
+    def _paths():
+        for file in _iter_yaml_files(captions_dir):
+            if skip_files and file in skip_files:
+                continue
+            if os.path.basename(file) in _SKIP_NAMES:
+                continue
+            yield file
+
+    for file, doc in _iter_parsed_yaml(_paths()):
         # try to extract meaningful fields
-        corrected = (doc.get("text_processing") or {}).get("corrected_text")
-        translated = (doc.get("translation") or {}).get("translated_text") or (doc.get("text_processing") or {}).get("translated_text")
-        full_text = (doc.get("ocr") or {}).get("full_text") or doc.get("full_text")
+        # hoist sub-dict lookups; the old `or {}` chains allocated a fresh
+        # dict for every missing key
+        tp = doc.get("text_processing")
+        tr = doc.get("translation")
+        ocr = doc.get("ocr")
+        corrected = tp.get("corrected_text") if tp else None
+        translated = (tr.get("translated_text") if tr else None) or (tp.get("translated_text") if tp else None)
+        full_text = (ocr.get("full_text") if ocr else None) or doc.get("full_text")
 
-        # fallbacks
-        texts = [translated or corrected or full_text]
-        if not texts:
-            texts = extract_text_fields_from_dict(doc)
+        # common case: a preferred field is set; fall back to the full tree
+        # extraction only when all three are empty. (The old list-based check
+        # wrapped None in a list, so the fallback never actually fired.)
+        t = translated or corrected or full_text
+        texts = [t] if t else extract_text_fields_from_dict(doc)
 
-        # read file and find image file name from it
-        doc = load_yaml(file)
+        # image file name comes from the same parsed doc
         image_file = doc.get("image_file")
-        for t in texts:
+        _uuid5 = uuid.uuid5
+        for i, t in enumerate(texts):
             yield {
-                "id": str(uuid.uuid4()),
+                "id": str(_uuid5(NS, f"{file}|{i}")),
                 "text": t,
                 "payload": {
                     "source": file,
@@ -72,32 +153,37 @@ def iter_stories(data_dir: str = DATA_DIR, skip_files: Set[str] = None) -> Itera
     if not os.path.exists(stories_dir):
         return
     # Each thread has ymls folder with page_*.yml
-    for root, dirs, files in os.walk(stories_dir):
-        for f in files:
-            path = os.path.join(root, f)
+    def _paths():
+        for path in _iter_yaml_files(stories_dir):
             if skip_files and path in skip_files:
                 continue
-            if f.endswith("tags-content.yml") or f.endswith("metadata.yml") or f.endswith("thread.yml"):
-                continue
-            if not f.endswith(".yml") and not f.endswith(".yaml"):
+            if os.path.basename(path) in _SKIP_NAMES:
                 continue
-            doc = load_yaml(path)
-            # if there's an explicit posts list
-            if isinstance(doc, dict) and "posts" in doc and isinstance(doc["posts"], list):
-                for i, post in enumerate(doc["posts"]):
+            yield path
+
+    for path, doc in _iter_parsed_yaml(_paths()):
+        f = os.path.basename(path)
+        # if there's an explicit posts list
+        if isinstance(doc, dict) and "posts" in doc and isinstance(doc["posts"], list):
+            for i, post in enumerate(doc["posts"]):
+                # plain-string posts have no flags or ids; guard before .get
+                if isinstance(post, str):
+                    t = post
+                    post_id = None
+                else:
                     if post.get("is_comment"):
                         continue
-                    if isinstance(post, str):
-                        t = post
-                    else:
-                        t = post.get("content")
-                    if t.strip():
-                        yield {"id": str(uuid.uuid4()), "text": t, "payload": {"source": path, "type": "story", "page": f, "post_id": post.get("post_id")}}
-            else:
-                # fallback: treat page as single document containing all string fields
-                texts = extract_text_fields_from_dict(doc)
-                if texts:
-                    yield {"id": str(uuid.uuid4()), "text": "\n".join(texts), "payload": {"source": path, "type": "story", "page": f}}
+                    # content may be missing/None on dirty corpora; skip the
+                    # post instead of crashing the whole page mid-ingest
+                    t = post.get("content") or ""
+                    post_id = post.get("post_id")
+                if t and t.strip():
+                    yield {"id": str(uuid.uuid5(NS, f"{path}|{f}|{post_id or i}")), "text": t, "payload": {"source": path, "type": "story", "page": f, "post_id": post_id}}
+        else:
+            # fallback: treat page as single document containing all string fields
+            texts = extract_text_fields_from_dict(doc)
+            if texts:
+                yield {"id": str(uuid.uuid5(NS, f"{path}|{f}")), "text": "\n".join(texts), "payload": {"source": path, "type": "story", "page": f}}
 
 
 def iter_all_documents(data_dir: str = DATA_DIR, skip_files_captions: Set[str] = None, skip_files_stories: Set[str] = None) -> Iterable[Dict[str, Any]]:
@@ -2,6 +2,7 @@
 # MODIFIED: app/main.py
 # ============================================
 import asyncio
+import itertools
 import os
 import logging
 from fastapi import FastAPI, HTTPException, Query
@@ -12,6 +13,7 @@ from .embeddings import embedder
 from .qdrant_service import qdrant
 from .ingest import iter_captions, iter_stories
 from .chunking import TextChunker  # NEW IMPORT
+from .schemas import BatchSearchRequest
 from .tracker import QdrantProcessTracker
 
 logger = logging.getLogger(__name__)
@@ -58,9 +60,23 @@ async def health():
     return {'status': status, 'services': services}
 
 
+# Lazily created so the semaphore binds to the running event loop
+_EMBED_SEM: Optional[asyncio.Semaphore] = None
+
+
+def _get_embed_sem() -> asyncio.Semaphore:
+    global _EMBED_SEM
+    if _EMBED_SEM is None:
+        gpu = CONFIG.get("embeddings", {}).get("gpu_type", "none")
+        _EMBED_SEM = asyncio.Semaphore(1 if gpu == "none" else 4)
+    return _EMBED_SEM
+
+
 async def _embed_texts(texts):
-    # encoding is CPU-bound; call in thread pool
-    return await asyncio.to_thread(embedder.encode, texts)
+    # encoding is CPU-bound; call in thread pool, but cap concurrent encodes
+    # so overlapping /search and /index requests don't thrash the embedder
+    async with _get_embed_sem():
+        return await asyncio.to_thread(embedder.encode, texts)
 
 
 @app.post("/index")
@@ -77,86 +93,113 @@ async def index(type: Optional[str] = Query("all", description="captions|stories
     skip_stories = tracker.get_processed_files("stories")
     logger.info(f"Loaded tracker: {len(skip_captions)} captions, {len(skip_stories)} stories already processed")
 
-    # Prepare iterators
-    raw_docs = []
+    # Prepare iterators; documents stream through chunking instead of being
+    # materialized, so memory stays O(batch) and embedding starts immediately
+    iterators = []
     if type in ("all", "captions"):
-        raw_docs.extend(list(iter_captions(skip_files=skip_captions)))
+        iterators.append(iter_captions(skip_files=skip_captions))
     if type in ("all", "stories"):
-        raw_docs.extend(list(iter_stories(skip_files=skip_stories)))
+        iterators.append(iter_stories(skip_files=skip_stories))
 
-    if not raw_docs:
-        return {"indexed": 0}
-
-    logger.info("Processing %s raw documents", len(raw_docs))
-    
-    # NEW: Chunk all documents before processing
-    all_chunks = []
-    for doc in raw_docs:
-        doc_id = doc['id']
-        text = doc['text']
-        
-        # Extract metadata from original doc
-        metadata = {
-            'type': doc['payload'].get('type'),
-            'source': doc['payload'].get('source'),
-            'image': doc['payload'].get('image'),
-            'page': doc['payload'].get('page'),
-            'post_id': doc['payload'].get('post_id'),
-        }
-        
-        # Chunk the document
-        chunks = chunker.chunk_text(text, doc_id, metadata)
-        all_chunks.extend(chunks)
-        
-        logger.debug(f"Document {doc_id} split into {len(chunks)} chunks")
-    
-    logger.info(f"Created {len(all_chunks)} chunks from {len(raw_docs)} documents")
-    
-    # Track which files are being processed in this run
+    # Track which files are being processed in this run (incrementally)
     newly_processed_files = {"captions": set(), "stories": set()}
-    for doc in raw_docs:
-        source = doc['payload'].get('source')
-        dtype = doc['payload'].get('type')
-        if dtype == "caption":
-            newly_processed_files["captions"].add(source)
-        else:
-            newly_processed_files["stories"].add(source)
-
-    # Process chunks in batches
-    total_indexed = 0
-    for i in range(0, len(all_chunks), INDEX_BATCH):
-        batch = all_chunks[i : i + INDEX_BATCH]
-        logger.info("Indexing batch %s (%s chunks)", i // INDEX_BATCH + 1, len(batch))
-        
-        texts = [chunk["text"] for chunk in batch]
-        vecs = await _embed_texts(texts)
-        
-        captions_points = []
-        stories_points = []
-        logger.debug(f"Embedding batch {i // INDEX_BATCH + 1} with {len(texts)} texts")
-        print(f"Embedding batch {i // INDEX_BATCH + 1} with {len(texts)} texts")
-        
-        for chunk, vec in zip(batch, vecs):
-            point = {
-                "id": chunk["id"],  # Now a valid UUID string
-                "vector": vec.tolist() if hasattr(vec, "tolist") else vec, 
-                "payload": chunk["payload"]
+    raw_count = 0
+    chunk_count = 0
+
+    def chunk_stream():
+        nonlocal raw_count, chunk_count
+        # hoist per-document attribute/key lookups out of the hot loop
+        _chunk_text = chunker.chunk_text
+        _add_caption = newly_processed_files["captions"].add
+        _add_story = newly_processed_files["stories"].add
+        for doc in itertools.chain(*iterators):
+            raw_count += 1
+            payload = doc['payload']
+            dtype = payload.get('type')
+            source = payload.get('source')
+
+            # Extract metadata from original doc
+            metadata = {
+                'type': dtype,
+                'source': source,
+                'image': payload.get('image'),
+                'page': payload.get('page'),
+                'post_id': payload.get('post_id'),
             }
-            
-            if chunk["payload"]["type"] == "caption":
-                captions_points.append(point)
+
+            if dtype == "caption":
+                _add_caption(source)
             else:
-                stories_points.append(point)
+                _add_story(source)
+
+            # Chunk the document
+            chunks = _chunk_text(doc['text'], doc['id'], metadata)
+            chunk_count += len(chunks)
+            logger.debug("Document %s split into %d chunks", doc['id'], len(chunks))
+            yield from chunks
+
+    # Process chunks in batches pulled from the stream. The upsert of batch
+    # N runs in a thread while batch N+1 is being embedded, so the CPU-bound
+    # encode and the network-bound upload overlap.
+    stream = chunk_stream()
+    total_indexed = 0
+    batch_num = 0
+    prev_upsert = None
+    ensured = set()
+    try:
+        while True:
+            batch = list(itertools.islice(stream, INDEX_BATCH))
+            if not batch:
+                break
+            batch_num += 1
+            logger.info("Indexing batch %s (%s chunks)", batch_num, len(batch))
 
-        if captions_points:
-            qdrant.ensure_collection(CAPTIONS_COLLECTION, embedder.dim)
-            qdrant.upsert_points(CAPTIONS_COLLECTION, captions_points)
-        if stories_points:
-            qdrant.ensure_collection(STORIES_COLLECTION, embedder.dim)
-            qdrant.upsert_points(STORIES_COLLECTION, stories_points)
+            texts = [chunk["text"] for chunk in batch]
+            vecs = await _embed_texts(texts)
 
-        total_indexed += len(batch)
-        logger.info("Indexed batch %s - total indexed: %s", i // INDEX_BATCH + 1, total_indexed)
+            logger.debug("Embedding batch %s with %d texts", batch_num, len(texts))
+
+            # Bucket points by type in one pass; keyed dispatch replaces the
+            # per-chunk branch and scales if more document types are added
+            buckets = {"caption": [], "story": []}
+            for chunk, vec in zip(batch, vecs):
+                # numpy rows pass straight through; QdrantService converts once
+                buckets[chunk["payload"]["type"]].append({
+                    "id": chunk["id"],  # Now a valid UUID string
+                    "vector": vec,
+                    "payload": chunk["payload"]
+                })
+
+            # Wait for the previous batch's upload before scheduling this one
+            if prev_upsert is not None:
+                await prev_upsert
+
+            upserts = []
+            for doc_kind, points in buckets.items():
+                if not points:
+                    continue
+                coll = CAPTIONS_COLLECTION if doc_kind == "caption" else STORIES_COLLECTION
+                # Ensure collections once, on the first batch that needs them
+                if coll not in ensured:
+                    qdrant.ensure_collection(coll, embedder.dim)
+                    ensured.add(coll)
+                upserts.append(asyncio.to_thread(qdrant.upsert_points, coll, points))
+            prev_upsert = asyncio.gather(*upserts) if upserts else None
+
+            total_indexed += len(batch)
+            logger.info("Indexed batch %s - total indexed: %s", batch_num, total_indexed)
+
+        if prev_upsert is not None:
+            await prev_upsert
+    finally:
+        # The span cache keys on full document text, so a run over long
+        # stories would otherwise pin thousands of documents in the
+        # long-lived server process. The CLI clears it per run; here the
+        # finally keeps memory at O(batch) even when a batch fails.
+        TextChunker.clear_cache()
+
+    if raw_count == 0:
+        return {"indexed": 0}
 
     # Save progress after all batches are done
     for source in newly_processed_files["captions"]:
@@ -167,16 +210,42 @@ async def index(type: Optional[str] = Query("all", description="captions|stories
     logger.info("Updated tracker with %d new files", len(newly_processed_files["captions"]) + len(newly_processed_files["stories"]))
 
     return {
-        "indexed": total_indexed, 
-        "raw_documents": len(raw_docs),
-        "chunks_created": len(all_chunks)
+        "indexed": total_indexed,
+        "raw_documents": raw_count,
+        "chunks_created": chunk_count
+    }
+
+
+def _filter_results(results, type: str):
+    """Post-process raw hits: caption image dedup + score threshold"""
+    if type == "captions":
+        # filter and only prepare unique result for each image url
+        unique_results = []
+        processed_image_urls = set()
+        for r in results:
+            if r["payload"]["image"] not in processed_image_urls:
+                processed_image_urls.add(r["payload"]["image"])
+                unique_results.append(r)
+        results = unique_results
+
+    # Apply score threshold filter
+    return [r for r in results if r.get("score", 0) >= SEARCH_SCORE_THRESHOLD]
+
+
+def _search_meta(limit: int) -> dict:
+    return {
+        "limit": limit,
+        "score_threshold": SEARCH_SCORE_THRESHOLD,
+        "chunking_enabled": True,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP
     }
 
 
 @app.get("/search")
 async def search(
-    q: str = Query(...), 
-    type: Optional[str] = Query("captions", description="captions|stories"), 
+    q: str = Query(...),
+    type: Optional[str] = Query("captions", description="captions|stories"),
     limit: Optional[int] = None
 ):
     if type not in ("captions", "stories"):
@@ -188,34 +257,43 @@ async def search(
     vecs = await _embed_texts([q])
     vec = vecs[0]
     coll = CAPTIONS_COLLECTION if type == "captions" else STORIES_COLLECTION
-    
+
     results = qdrant.hybrid_search(
-        coll, 
-        vector=vec.tolist() if hasattr(vec, "tolist") else vec,
+        coll,
+        vector=vec,
         text_query=q,
         limit=limit
     )
 
-    if type == "captions":
-        # filter and only prepare unique result for each image url
-        unique_results = []
-        processed_image_urls = set()
-        for r in results:
-            if r["payload"]["image"] not in processed_image_urls:
-                processed_image_urls.add(r["payload"]["image"])
-                unique_results.append(r)
-        results = unique_results
+    return {
+        "results": _filter_results(results, type),
+        "meta": _search_meta(limit)
+    }
 
-    # Apply score threshold filter
-    filtered = [r for r in results if r.get("score", 0) >= SEARCH_SCORE_THRESHOLD]
+
+@app.post("/search/batch")
+async def search_batch(req: BatchSearchRequest):
+    """Run several queries in one request: the whole query list is embedded
+    in a single encode call, then the per-query Qdrant lookups run in
+    parallel threads."""
+    if req.type not in ("captions", "stories"):
+        raise HTTPException(status_code=400, detail="Invalid type")
+    if not req.queries:
+        raise HTTPException(status_code=400, detail="queries must be non-empty")
+
+    limit = req.limit if req.limit is not None else SEARCH_TOP_K
+    coll = CAPTIONS_COLLECTION if req.type == "captions" else STORIES_COLLECTION
+
+    vecs = await _embed_texts(req.queries)
+    hits_per_query = await asyncio.gather(*[
+        asyncio.to_thread(qdrant.hybrid_search, coll, vec, q, limit)
+        for vec, q in zip(vecs, req.queries)
+    ])
 
     return {
-        "results": filtered, 
-        "meta": {
-            "limit": limit, 
-            "score_threshold": SEARCH_SCORE_THRESHOLD,
-            "chunking_enabled": True,
-            "chunk_size": CHUNK_SIZE,
-            "chunk_overlap": CHUNK_OVERLAP
-        }
+        "results": [
+            {"query": q, "results": _filter_results(hits, req.type)}
+            for q, hits in zip(req.queries, hits_per_query)
+        ],
+        "meta": _search_meta(limit)
     }
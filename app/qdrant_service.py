@@ -1,7 +1,7 @@
 import logging
 import uuid
 from typing import List, Dict, Any, Optional
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models as rest_models
 from qdrant_client.models import Prefetch, Fusion
 from .config import CONFIG
@@ -15,25 +15,71 @@ class QdrantService:
     def __init__(self, url: str = QDRANT_URL, timeout: int = QDRANT_TIMEOUT):
         # qdrant-client accepts url param
         self.client = QdrantClient(url=url, timeout=timeout)
+        # async twin for bulk pipelines: awaiting the upsert directly keeps
+        # the thread pool free instead of parking a worker per upload
+        self.aclient = AsyncQdrantClient(url=url, timeout=timeout)
+        # collections already verified/created by this process
+        self._ensured: set = set()
+        # collection_name -> whether sparse vectors are configured
+        self._sparse_cache: Dict[str, bool] = {}
         logger.info("Connected to Qdrant at %s", url)
 
     def ensure_collection(self, collection_name: str, vector_size: int):
+        if collection_name in self._ensured:
+            return
         try:
             # create collection if missing; ignore if exists
             self.client.get_collection(collection_name=collection_name)
         except Exception:
+            # FLOAT16 storage + int8 scalar quantization halve vector RAM and
+            # speed up server-side similarity scoring; clients still send
+            # plain float lists and Qdrant converts on ingest
             self.client.create_collection(
                 collection_name=collection_name,
-                vectors_config=rest_models.VectorParams(size=vector_size, distance=rest_models.Distance.COSINE),
+                vectors_config=rest_models.VectorParams(
+                    size=vector_size,
+                    distance=rest_models.Distance.COSINE,
+                    datatype=rest_models.Datatype.FLOAT16,
+                ),
+                quantization_config=rest_models.ScalarQuantization(
+                    scalar=rest_models.ScalarQuantizationConfig(
+                        type=rest_models.ScalarType.INT8,
+                        always_ram=True,
+                    )
+                ),
             )
+        self._ensured.add(collection_name)
+
+    @staticmethod
+    def _to_point_structs(points: List[Any]):
+        # points: PointStruct objects are passed through untouched;
+        # legacy [{'id':..., 'vector':..., 'payload': {...}}, ...] dicts are wrapped.
+        # This is the single conversion point for numpy vectors; callers
+        # don't need their own per-point .tolist() branches.
+        if points and isinstance(points[0], rest_models.PointStruct):
+            return points
+        # Must be a materialized list: client.upsert calls len(points) before
+        # building the request, so a generator raises TypeError client-side.
+        return [
+            rest_models.PointStruct(
+                id=p['id'],
+                vector=p['vector'].tolist() if hasattr(p['vector'], 'tolist') else p['vector'],
+                payload=p['payload'],
+            )
+            for p in points
+        ]
+
+    def upsert_points(self, collection_name: str, points: List[Any]):
+        self.client.upsert(collection_name=collection_name, points=self._to_point_structs(points))
 
-    def upsert_points(self, collection_name: str, points: List[Dict[str, Any]]):
-        # points: [{'id':..., 'vector':..., 'payload': {...}}, ...]
-        point_structs = [rest_models.PointStruct(id=p['id'], vector=p['vector'], payload=p['payload']) for p in points]
-        self.client.upsert(collection_name=collection_name, points=point_structs)
+    async def upsert_points_async(self, collection_name: str, points: List[Any]):
+        """Async variant of upsert_points for bulk indexing pipelines"""
+        await self.aclient.upsert(collection_name=collection_name, points=self._to_point_structs(points))
 
 
     def search(self, collection_name: str, vector: List[float], limit: int = 10):
+        if hasattr(vector, "tolist"):
+            vector = vector.tolist()
         hits = self.client.query_points(
             collection_name=collection_name,
             query=vector,
@@ -59,14 +105,19 @@ class QdrantService:
         """
         Hybrid search with automatic fallback to dense-only search
         """
-        # Check if collection has sparse vectors configured
-        try:
-            collection_info = self.client.get_collection(collection_name)
-            has_sparse = hasattr(collection_info.config, 'sparse_vectors_config') and \
-                        collection_info.config.sparse_vectors_config is not None
-        except:
-            has_sparse = False
-        
+        if hasattr(vector, "tolist"):
+            vector = vector.tolist()
+        # Check if collection has sparse vectors configured; cached so each
+        # query doesn't pay a get_collection round-trip
+        has_sparse = self._sparse_cache.get(collection_name)
+        if has_sparse is None:
+            try:
+                collection_info = self.client.get_collection(collection_name)
+                has_sparse = getattr(collection_info.config, 'sparse_vectors_config', None) is not None
+            except:
+                has_sparse = False
+            self._sparse_cache[collection_name] = has_sparse
+
         # If we have sparse vectors and a text query, do hybrid search
         if has_sparse and text_query:
             try:
@@ -4,6 +4,11 @@ from typing import Optional
 class IndexRequest(BaseModel):
     type: Optional[str] = "all"  # captions | stories | all
 
+class BatchSearchRequest(BaseModel):
+    queries: list[str]
+    type: Optional[str] = "captions"  # captions | stories
+    limit: Optional[int] = None
+
 class SearchResponseItem(BaseModel):
     id: str
     score: float
@@ -2,23 +2,31 @@ import os
 import yaml
 from typing import Set, Dict, List
 
+try:
+    # libyaml C implementations when available
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
 class QdrantProcessTracker:
     def __init__(self, tracker_path: str = "config/qdrant-process-tracker.yml"):
         self.tracker_path = tracker_path
-        self.processed_files: Dict[str, List[str]] = {
-            "captions": [],
-            "stories": []
+        # sets keep is_processed / mark_as_processed O(1); serialized as
+        # sorted lists only at save time
+        self.processed_files: Dict[str, Set[str]] = {
+            "captions": set(),
+            "stories": set()
         }
         self.load()
 
     def load(self):
         if os.path.exists(self.tracker_path):
             try:
-                with open(self.tracker_path, "r", encoding="utf-8") as f:
-                    data = yaml.safe_load(f)
+                with open(self.tracker_path, "rb") as f:
+                    data = yaml.load(f, Loader=_YamlLoader)
                     if data:
-                        self.processed_files["captions"] = data.get("captions", [])
-                        self.processed_files["stories"] = data.get("stories", [])
+                        self.processed_files["captions"] = set(data.get("captions") or [])
+                        self.processed_files["stories"] = set(data.get("stories") or [])
             except Exception as e:
                 print(f"Error loading tracker file: {e}")
 
@@ -26,18 +34,16 @@ class QdrantProcessTracker:
         os.makedirs(os.path.dirname(self.tracker_path), exist_ok=True)
         try:
             with open(self.tracker_path, "w", encoding="utf-8") as f:
-                yaml.safe_dump(self.processed_files, f, default_flow_style=False)
+                serializable = {k: sorted(v) for k, v in self.processed_files.items()}
+                yaml.dump(serializable, f, Dumper=_YamlDumper, default_flow_style=False)
         except Exception as e:
             print(f"Error saving tracker file: {e}")
 
     def is_processed(self, file_path: str, category: str) -> bool:
-        return file_path in self.processed_files.get(category, [])
+        return file_path in self.processed_files.get(category, set())
 
     def mark_as_processed(self, file_path: str, category: str):
-        if category not in self.processed_files:
-            self.processed_files[category] = []
-        if file_path not in self.processed_files[category]:
-            self.processed_files[category].append(file_path)
+        self.processed_files.setdefault(category, set()).add(file_path)
 
     def get_processed_files(self, category: str) -> Set[str]:
-        return set(self.processed_files.get(category, []))
+        return self.processed_files.get(category, set())
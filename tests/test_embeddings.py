@@ -1,5 +1,6 @@
 import os
 import sys
+import numpy as np
 import pytest
 
 # Ensure project root is on sys.path for imports
@@ -27,10 +28,10 @@ def test_ollama_client_embed_with_kwargs():
 
     embedder.ollama_client = MockClient()
     vecs = embedder.encode(["hello world"])
-    assert vecs == [[1.0, 2.0]]
+    assert vecs.tolist() == [[1.0, 2.0]]
 
 
-def test_ollama_client_embed_fallback_to_http(monkeypatch):
+def test_ollama_client_embed_fallback_to_http():
     # Simulate client unavailable and HTTP POST returning data
     embedder = OllamaEmbedder(model_name="my-model", endpoint="http://localhost:11434")
 
@@ -44,22 +45,24 @@ def test_ollama_client_embed_fallback_to_http(monkeypatch):
         def json(self):
             return self._data
 
-    def fake_post(url, json, timeout):
-        assert url.endswith("/embed")
-        assert json["model"] == "my-model"
-        return MockResponse({"embeddings": [[0.5, 0.6]]})
+    class MockHTTP:
+        def post(self, url, json, timeout):
+            assert url.endswith("/embed")
+            assert json["model"] == "my-model"
+            return MockResponse({"embeddings": [[0.5, 0.6]]})
 
-    # Disable client to force HTTP path
+    # Disable client to force the pooled HTTP path
     embedder.ollama_client = None
-    monkeypatch.setattr("httpx.post", fake_post)
+    embedder._http = MockHTTP()
 
     vecs = embedder.encode(["hi"])
-    assert vecs == [[0.5, 0.6]]
+    assert np.allclose(vecs, [[0.5, 0.6]])
 
-    vecs = embedder.encode(["message one", "message two", "message three"])    assert isinstance(vecs, list)
+    vecs = embedder.encode(["message one", "message two", "message three"])
+    assert hasattr(vecs, "tolist")
 
 
-def test_ollama_response_with_metadata_and_embeds(monkeypatch):
+def test_ollama_response_with_metadata_and_embeds():
     # Simulate a metadata-heavy response where "embeddings" is a dict mapping indices to vectors
     embedder = OllamaEmbedder(model_name="my-model", endpoint="http://localhost:11434")
 
@@ -82,18 +85,19 @@ def test_ollama_response_with_metadata_and_embeds(monkeypatch):
         }
     }
 
-    def fake_post(url, json, timeout):
-        assert url.endswith("/embed")
-        return MockResponse(fake)
+    class MockHTTP:
+        def post(self, url, json, timeout):
+            assert url.endswith("/embed")
+            return MockResponse(fake)
 
     embedder.ollama_client = None
-    monkeypatch.setattr("httpx.post", fake_post)
+    embedder._http = MockHTTP()
 
     vecs = embedder.encode(["a", "b"])
-    assert vecs == [[0.1, 0.2], [0.3, 0.4]]
+    assert np.allclose(vecs, [[0.1, 0.2], [0.3, 0.4]])
 
 
-def test_ollama_nested_data_structures(monkeypatch):
+def test_ollama_nested_data_structures():
     # Response with embeddings nested inside data->list of dicts
     embedder = OllamaEmbedder(model_name="my-model", endpoint="http://localhost:11434")
 
@@ -117,11 +121,12 @@ def test_ollama_nested_data_structures(monkeypatch):
         }
     }
 
-    def fake_post(url, json, timeout):
-        return MockResponse(fake)
+    class MockHTTP:
+        def post(self, url, json, timeout):
+            return MockResponse(fake)
 
     embedder.ollama_client = None
-    monkeypatch.setattr("httpx.post", fake_post)
+    embedder._http = MockHTTP()
 
     vecs = embedder.encode(["one", "two"])
-    assert vecs == [[0.7, 0.8], [0.9, 1.0]]    
\ No newline at end of file
+    assert np.allclose(vecs, [[0.7, 0.8], [0.9, 1.0]])
\ No newline at end of file
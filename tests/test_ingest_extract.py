@@ -0,0 +1,30 @@
+import os
+import sys
+
+# Ensure project root is on sys.path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.ingest import extract_text_fields_from_dict
+
+
+def test_extract_preserves_document_order():
+    doc = {
+        "a": "first",
+        "b": {"c": ["second", {"d": "third"}]},
+        "e": "fourth",
+    }
+    assert extract_text_fields_from_dict(doc) == ["first", "second", "third", "fourth"]
+
+
+def test_extract_skips_empty_and_non_strings():
+    doc = {"a": "  ", "b": ["", 42, None, " kept "], "c": True}
+    assert extract_text_fields_from_dict(doc) == ["kept"]
+
+
+def test_extract_handles_deep_nesting():
+    # deeper than the default recursion limit; the iterative walk must not
+    # raise RecursionError
+    doc = "leaf"
+    for _ in range(5000):
+        doc = {"level": doc}
+    assert extract_text_fields_from_dict(doc) == ["leaf"]
@@ -0,0 +1,69 @@
+import os
+import sys
+import numpy as np
+import pytest
+from qdrant_client.http import models as rest_models
+
+# Ensure project root is on sys.path for imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.qdrant_service import QdrantService
+
+
+class MockClient:
+    def __init__(self):
+        self.calls = []
+
+    def upsert(self, collection_name, points):
+        # qdrant-client checks len(points) before building the request, so
+        # anything without __len__ (e.g. a generator) fails client-side
+        assert len(points) > 0
+        self.calls.append((collection_name, list(points)))
+
+
+def _service_with_mock():
+    # Skip __init__ so no connection to a Qdrant instance is attempted
+    svc = QdrantService.__new__(QdrantService)
+    svc.client = MockClient()
+    return svc
+
+
+def test_upsert_points_wraps_legacy_dicts():
+    svc = _service_with_mock()
+    svc.upsert_points("captions", [
+        {
+            "id": "11111111-1111-1111-1111-111111111111",
+            "vector": np.array([0.1, 0.2], dtype=np.float32),
+            "payload": {"type": "caption"},
+        },
+        {
+            "id": "22222222-2222-2222-2222-222222222222",
+            "vector": [0.3, 0.4],
+            "payload": {"type": "caption"},
+        },
+    ])
+
+    (coll, pts), = svc.client.calls
+    assert coll == "captions"
+    assert all(isinstance(p, rest_models.PointStruct) for p in pts)
+    # numpy vectors are converted to plain lists for the JSON request
+    assert type(pts[0].vector) is list
+    assert np.allclose(pts[0].vector, [0.1, 0.2])
+    assert pts[1].vector == [0.3, 0.4]
+    assert pts[0].payload == {"type": "caption"}
+
+
+def test_upsert_points_passes_point_structs_through():
+    svc = _service_with_mock()
+    points = [
+        rest_models.PointStruct(
+            id="33333333-3333-3333-3333-333333333333",
+            vector=[0.5, 0.6],
+            payload={"type": "story"},
+        )
+    ]
+    svc.upsert_points("stories", points)
+
+    (coll, pts), = svc.client.calls
+    assert coll == "stories"
+    assert pts == points